@@ -728,10 +728,7 @@ class RecordField(Documented):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "RecordField":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "name" in _doc:
             try:
@@ -880,10 +877,7 @@ class RecordSchema(Savable):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "RecordSchema":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "fields" in _doc:
             try:
@@ -1005,10 +999,7 @@ class EnumSchema(Savable):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "EnumSchema":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         try:
             symbols = load_field(
@@ -1122,10 +1113,7 @@ class ArraySchema(Savable):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "ArraySchema":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         try:
             items = load_field(
@@ -1263,10 +1251,7 @@ class JsonldPredicate(Savable):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "JsonldPredicate":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "_id" in _doc:
             try:
@@ -1622,10 +1607,7 @@ class SpecializeDef(Savable):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "SpecializeDef":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         try:
             specializeFrom = load_field(
@@ -1768,10 +1750,7 @@ class SaladRecordField(RecordField):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "SaladRecordField":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "name" in _doc:
             try:
@@ -1991,10 +1970,7 @@ class SaladRecordSchema(NamedType, RecordSchema, SchemaDefinedType):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "SaladRecordSchema":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "name" in _doc:
             try:
@@ -2424,10 +2400,7 @@ class SaladEnumSchema(NamedType, EnumSchema, SchemaDefinedType):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "SaladEnumSchema":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "name" in _doc:
             try:
@@ -2793,10 +2766,7 @@ class Documentation(NamedType, DocType):
         loadingOptions: LoadingOptions,
         docRoot: Optional[str] = None,
     ) -> "Documentation":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
+        _doc = doc
         _errors__ = []
         if "name" in _doc:
             try:
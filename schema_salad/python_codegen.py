@@ -1,6 +1,8 @@
 """Python code generator for a given schema salad definition."""
-import textwrap
-from io import StringIO
+import functools
+import keyword
+import re
+import sys
 from typing import (
     IO,
     Any,
@@ -10,6 +12,7 @@ from typing import (
     MutableSequence,
     Optional,
     Set,
+    Tuple,
     Union,
 )
 
@@ -18,12 +21,42 @@ try:
 except ModuleNotFoundError:
     black = None  # type: ignore[assignment]
 
-from pkg_resources import resource_stream
-
 from . import schema
 from .codegen_base import CodeGenBase, TypeDef
 from .exceptions import SchemaException
-from .schema import shortname
+from .schema import shortname as _shortname
+
+
+def _load_support() -> str:
+    """Read python_codegen_support.py, minus its first (docstring) line."""
+    try:
+        from importlib.resources import files
+    except ImportError:  # Python < 3.9
+        from pkg_resources import resource_string
+
+        text = resource_string("schema_salad", "python_codegen_support.py").decode(
+            "UTF-8"
+        )
+    else:
+        text = (
+            files("schema_salad")
+            .joinpath("python_codegen_support.py")
+            .read_text(encoding="UTF-8")
+        )
+    return text[text.find("\n") + 1 :]
+
+
+_SUPPORT_TEXT = _load_support()
+
+_TYPE_DEFS_BATCH_SIZE = 500
+
+_ARRAY_TYPES = ("array", "https://w3id.org/cwl/salad#array")
+_ENUM_TYPES = ("enum", "https://w3id.org/cwl/salad#enum")
+_RECORD_TYPES = ("record", "https://w3id.org/cwl/salad#record")
+_EXPRESSION_TYPES = ("Expression", "https://w3id.org/cwl/cwl#Expression")
+
+# Field and class names are looked up many times per class, so cache them.
+shortname = functools.lru_cache(maxsize=None)(_shortname)
 
 _string_type_def = TypeDef("strtype", "_PrimitiveLoader(str)")
 _int_type_def = TypeDef("inttype", "_PrimitiveLoader(int)")
@@ -32,15 +65,16 @@ _bool_type_def = TypeDef("booltype", "_PrimitiveLoader(bool)")
 _null_type_def = TypeDef("None_type", "_PrimitiveLoader(type(None))")
 _any_type_def = TypeDef("Any_type", "_AnyLoader()")
 
+# Keys are interned so that lookups of interned type names compare by identity.
 prims = {
-    "http://www.w3.org/2001/XMLSchema#string": _string_type_def,
-    "http://www.w3.org/2001/XMLSchema#int": _int_type_def,
-    "http://www.w3.org/2001/XMLSchema#long": _int_type_def,
-    "http://www.w3.org/2001/XMLSchema#float": _float_type_def,
-    "http://www.w3.org/2001/XMLSchema#double": _float_type_def,
-    "http://www.w3.org/2001/XMLSchema#boolean": _bool_type_def,
-    "https://w3id.org/cwl/salad#null": _null_type_def,
-    "https://w3id.org/cwl/salad#Any": _any_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#string"): _string_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#int"): _int_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#long"): _int_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#float"): _float_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#double"): _float_type_def,
+    sys.intern("http://www.w3.org/2001/XMLSchema#boolean"): _bool_type_def,
+    sys.intern("https://w3id.org/cwl/salad#null"): _null_type_def,
+    sys.intern("https://w3id.org/cwl/salad#Any"): _any_type_def,
     "string": _string_type_def,
     "int": _int_type_def,
     "long": _int_type_def,
@@ -52,26 +86,367 @@ prims = {
 }
 
 
-def fmt(text: str, indent: int) -> str:
+_MODES: Dict[int, "black.mode.Mode"] = (
+    {
+        i: black.mode.Mode(
+            target_versions={black.mode.TargetVersion.PY36}, line_length=88 - i
+        )
+        for i in (0, 4, 8, 12)
+    }
+    if black
+    else {}
+)
+
+
+# Keywords are not names; only True, False and None are spelled like one
+# when used as a value.
+_KEYWORDS_RE = "|".join(keyword.kwlist)
+_VALUE_KEYWORDS_RE = "|".join(
+    k for k in keyword.kwlist if k not in ("True", "False", "None")
+)
+
+
+def _canonical_expr_re(depth: int) -> str:
     """
-    Use black to format this snippet.
+    Build a pattern for expressions written the way black would write them.
 
-    :param indent the indent level for the current context
+    Names, numbers and double quoted strings without escapes, combined with
+    calls, attribute access, tuples and lists nested up to ``depth`` levels.
+    Items are separated by ", " with no trailing comma (so tuples have at
+    least two items) and there is no other whitespace, so black has nothing
+    to normalize.
+    """
+    name = rf"(?!(?:{_VALUE_KEYWORDS_RE})\b)[A-Za-z_]\w*"
+    atom = rf'(?:{name}|"[^"\\\n]*")'
+    number = r"(?:0|[1-9]\d*)"
+    if depth == 0:
+        return f"(?:{atom}|{number})"
+    inner = _canonical_expr_re(depth - 1)
+    items = f"(?:{inner}(?:, {inner})*)"
+    return (
+        rf"(?:(?:{atom}|\({inner}(?:, {inner})+\)|\[{items}?\])"
+        rf"(?:\({items}?\)|\.{name})*|{number})"
+    )
+
+
+# A single assignment of an expression, as emitted for the collected types;
+# black leaves these untouched as long as they fit on one line.  A
+# parenthesized right hand side is excluded as black may drop the parentheses.
+_TRIVIAL_SNIPPET_RE = re.compile(
+    rf"(?!(?:{_KEYWORDS_RE})\b)[A-Za-z_]\w* = (?!\(){_canonical_expr_re(3)}\n"
+)
+
+
+def _is_trivial(text: str, indent: int) -> bool:
+    """Check if black would not change this snippet."""
+    return len(text) < 88 - indent and _TRIVIAL_SNIPPET_RE.fullmatch(text) is not None
+
+
+def _indent_fast(text: str, indent: int) -> str:
+    """
+    Indent all non-empty lines of the snippet.
+
+    Unlike :py:func:`textwrap.indent` only "\\n" ends a line, so characters
+    such as "\\x0c" or "\\u2028" inside string literals (for instance in
+    docstrings) are passed through verbatim instead of being indented.
     """
+    if not indent:
+        return text
+    pad = " " * indent
+    return "\n".join(pad + line if line else line for line in text.split("\n"))
+
+
+def _require_black() -> None:
+    """Check that black is installed."""
     if not black:
         raise Exception(
             "Must install 'black' to use the Python code generator. "
             "If installing schema-salad via pip, try `pip install schema-salad[pycodegen]`."
         )
-    return textwrap.indent(
-        black.format_str(
-            text,
-            mode=black.mode.Mode(
-                target_versions={black.mode.TargetVersion.PY36}, line_length=88 - indent
-            ),
-        ),
-        " " * indent,
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_cached(text: str, indent: int) -> str:
+    """Run black on the snippet, memoized as the same snippets recur per class."""
+    _require_black()
+    mode = _MODES.get(indent)
+    if mode is None:
+        mode = _MODES[indent] = black.mode.Mode(
+            target_versions={black.mode.TargetVersion.PY36}, line_length=88 - indent
+        )
+    return _indent_fast(black.format_str(text, mode=mode), indent)
+
+
+def fmt(text: str, indent: int) -> str:
+    """
+    Use black to format this snippet.
+
+    :param indent the indent level for the current context
+    """
+    _require_black()
+    if _is_trivial(text, indent):
+        return _indent_fast(text, indent)
+    return _format_cached(text, indent)
+
+
+def _freeze(type_declaration: Any) -> Any:
+    """Convert a type declaration into a hashable equivalent."""
+    if isinstance(type_declaration, MutableSequence):
+        return tuple(_freeze(i) for i in type_declaration)
+    if isinstance(type_declaration, MutableMapping):
+        return frozenset((k, _freeze(v)) for k, v in type_declaration.items())
+    return type_declaration
+
+
+@functools.lru_cache(maxsize=None)
+def safe_name(name: str) -> str:
+    """Generate a safe version of the given name."""
+    avn = schema.avro_field_name(name)
+    if avn.startswith("anon."):
+        avn = avn[5:]
+    if avn in ("class", "in"):
+        # reserved words
+        avn = avn + "_"
+    return avn
+
+
+def _tmpl_class_check(classname: str) -> str:
+    return f"""
+        if _doc.get("class") != "{classname}":
+            raise ValidationException("Not a {classname}")
+
+"""
+
+
+def _tmpl_class_save(classname: str) -> str:
+    return f"""
+        r["class"] = "{classname}"
+"""
+
+
+_EXTENSION_FIELDS_HEAD = """\
+        extension_fields: Dict[str, Any] = {}
+        for k in _doc.keys():
+            if k not in cls.attrs:
+                if ":" in k:
+                    ex = expand_url(
+                        k, "", loadingOptions, scoped_id=False, vocab_term=False
+                    )
+                    extension_fields[ex] = _doc[k]
+                else:
+                    _errors__.append(
+                        ValidationException(
+"""
+
+_EXTENSION_FIELDS_TAIL = """\
+                            SourceLine(_doc, k, str),
+                        )
+                    )
+                    break
+
+"""
+
+
+def _tmpl_extension_fields(attrstr: str, classname: str) -> str:
+    """
+    Render the extension field check at the end of ``fromDoc``.
+
+    The code is emitted exactly as black would format it, without running
+    black on the long error message; only the final ``raise`` is formatted
+    by black when it does not fit on one line.
+    """
+    message = f'"invalid field `{{}}`, expected one of: {attrstr}"'
+    if 28 + len(message) + len(".format(k),") <= 88:
+        message_lines = f"{' ' * 28}{message}.format(k),\n"
+    else:
+        message_lines = f"{' ' * 28}{message}.format(\n{' ' * 32}k\n{' ' * 28}),\n"
+    raise_line = f"raise ValidationException(\"Trying '{classname}'\", None, _errors__)"
+    if 12 + len(raise_line) <= 88:
+        errors_check = f"        if _errors__:\n            {raise_line}\n"
+    else:
+        errors_check = fmt(f"if _errors__:\n    {raise_line}\n", 8)
+    return (
+        _EXTENSION_FIELDS_HEAD + message_lines + _EXTENSION_FIELDS_TAIL + errors_check
+    )
+
+
+_INIT_TRAILER = """
+        extension_fields: Optional[Dict[str, Any]] = None,
+        loadingOptions: Optional[LoadingOptions] = None,
+    ) -> None:
+"""
+
+_INIT_BODY = """
+        if extension_fields:
+            self.extension_fields = extension_fields
+        else:
+            self.extension_fields = CommentedMap()
+        if loadingOptions:
+            self.loadingOptions = loadingOptions
+        else:
+            self.loadingOptions = LoadingOptions()
+"""
+
+_FROM_DOC_HEAD = """
+    @classmethod
+    def fromDoc(
+        cls,
+        doc: Any,
+        baseuri: str,
+        loadingOptions: LoadingOptions,
+        docRoot: Optional[str] = None,
+    ) -> """
+
+_FROM_DOC_BODY = """
+        _doc = doc
+        _errors__ = []
+"""
+
+_RETURN_CLS_TRAILER = """
+            extension_fields=extension_fields,
+            loadingOptions=loadingOptions,
+        )
+"""
+
+_SAVE_PRELUDE = """
+    def save(
+        self, top: bool = False, base_url: str = "", relative_uris: bool = True
+    ) -> Dict[str, Any]:
+        r: Dict[str, Any] = {}
+        for ef in self.extension_fields:
+            r[prefix_url(ef, self.loadingOptions.vocab)] = self.extension_fields[ef]
+"""
+
+_SAVE_EPILOGUE = """
+        # top refers to the directory level
+        if top:
+            if self.loadingOptions.namespaces:
+                r["$namespaces"] = self.loadingOptions.namespaces
+            if self.loadingOptions.schemas:
+                r["$schemas"] = self.loadingOptions.schemas
+        return r
+
+"""
+
+_ID_FIELD_TMPL = """
+        __original___SAFE___is_none = __SAFE__ is None
+        if __SAFE__ is None:
+            if docRoot is not None:
+                __SAFE__ = docRoot
+            else:
+                __OPT__
+        if not __original___SAFE___is_none:
+            baseuri = __SAFE__
+"""
+
+_FIELD_TMPL = """\
+__SPC__        try:
+__SPC__            __SAFE__ = load_field(
+__SPC__                _doc.get("__FIELD__"),
+__SPC__                __TYPE__,
+__SPC__                baseuri,
+__SPC__                loadingOptions,
+__SPC__            )
+__SPC__        except ValidationException as e:
+__SPC__            _errors__.append(
+__SPC__                ValidationException(
+__SPC__                    "the `__FIELD__` field is not valid because:",
+__SPC__                    SourceLine(_doc, "__FIELD__", str),
+__SPC__                    [e],
+__SPC__                )
+__SPC__            )
+"""
+
+# _FIELD_TMPL for required (False) and optional (True) fields
+_FIELD_TMPLS = {
+    False: _FIELD_TMPL.replace("__SPC__", ""),
+    True: _FIELD_TMPL.replace("__SPC__", "    "),
+}
+
+
+def _tmpl_save_uri(
+    safename: str,
+    fieldname: str,
+    baseurl: str,
+    scoped_id: bool,
+    ref_scope: Optional[int],
+) -> str:
+    return f"""
+if self.{safename} is not None:
+    u = save_relative_uri(self.{safename}, {baseurl}, {scoped_id}, {ref_scope}, relative_uris)
+    if u:
+        r["{fieldname}"] = u
+"""
+
+
+def _tmpl_save(safename: str, fieldname: str, baseurl: str) -> str:
+    return f"""
+if self.{safename} is not None:
+    r["{fieldname}"] = save(
+        self.{safename}, top=False, base_url={baseurl}, relative_uris=relative_uris
+    )
+"""
+
+
+_ASCII_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_PLAIN_STRING_RE = re.compile(r"[\w$@.:/#-]+", re.ASCII)
+
+# Formatted serializer snippets with placeholder names, by snippet shape
+_SAVE_SNIPPETS: Dict[Tuple[Any, ...], str] = {}
+
+
+def _save_field_snippet(
+    safename: str, fieldname: str, baseurl: str, fieldtype: TypeDef
+) -> str:
+    """
+    Format the code saving one field, for ``PythonCodeGen.save``.
+
+    The layout black picks only depends on the shape of the snippet and on
+    the length of the names, so each shape is formatted once with placeholder
+    names of the same length, which are then replaced by the real names.
+    """
+    safe_ph = "Z" * len(safename)
+    field_ph = "Q" * len(fieldname)
+    if (
+        _ASCII_NAME_RE.fullmatch(safename) is None
+        or _PLAIN_STRING_RE.fullmatch(fieldname) is None
+        or safe_ph in baseurl
+        or field_ph in baseurl
+        or field_ph in safename
+    ):
+        if fieldtype.is_uri:
+            return fmt(
+                _tmpl_save_uri(
+                    safename,
+                    fieldname,
+                    baseurl,
+                    fieldtype.scoped_id,
+                    fieldtype.ref_scope,
+                ),
+                8,
+            )
+        return fmt(_tmpl_save(safename, fieldname, baseurl), 8)
+    key = (
+        fieldtype.is_uri,
+        fieldtype.scoped_id,
+        fieldtype.ref_scope,
+        baseurl,
+        len(safename),
+        len(fieldname),
     )
+    snippet = _SAVE_SNIPPETS.get(key)
+    if snippet is None:
+        if fieldtype.is_uri:
+            snippet = fmt(
+                _tmpl_save_uri(
+                    safe_ph, field_ph, baseurl, fieldtype.scoped_id, fieldtype.ref_scope
+                ),
+                8,
+            )
+        else:
+            snippet = fmt(_tmpl_save(safe_ph, field_ph, baseurl), 8)
+        _SAVE_SNIPPETS[key] = snippet
+    return snippet.replace(safe_ph, safename).replace(field_ph, fieldname)
 
 
 class PythonCodeGen(CodeGenBase):
@@ -85,26 +460,31 @@ class PythonCodeGen(CodeGenBase):
     ) -> None:
         super().__init__()
         self.out = out
+        # Output is collected as a list of strings and written to ``out``
+        # in one go by ``epilogue``.
+        self._out_parts: List[str] = []
+        self._w = self._out_parts.append
         self.current_class_is_abstract = False
-        self.serializer = StringIO()
+        self._serializer_parts: List[str] = []
+        self._ws = self._serializer_parts.append
         self.idfield = ""
         self.copyright = copyright
         self.parser_info = parser_info
+        self._loader_cache: Dict[Any, TypeDef] = {}
 
     @staticmethod
     def safe_name(name: str) -> str:
         """Generate a safe version of the given name."""
-        avn = schema.avro_field_name(name)
-        if avn.startswith("anon."):
-            avn = avn[5:]
-        if avn in ("class", "in"):
-            # reserved words
-            avn = avn + "_"
-        return avn
+        return safe_name(name)
+
+    def _flush(self) -> None:
+        """Write out all of the generated code collected so far."""
+        self.out.write("".join(self._out_parts))
+        self._out_parts.clear()
 
     def prologue(self) -> None:
         """Trigger to generate the prolouge code."""
-        self.out.write(
+        self._w(
             """#
 # This file was autogenerated using schema-salad-tool --codegen=python
 # The code itself is released under the Apache 2.0 license and the help text is
@@ -112,7 +492,7 @@ class PythonCodeGen(CodeGenBase):
 """
         )
         if self.copyright:
-            self.out.write(
+            self._w(
                 """
 #
 # The original schema is {copyright}.
@@ -121,13 +501,10 @@ class PythonCodeGen(CodeGenBase):
                 )
             )
 
-        stream = resource_stream(__name__, "python_codegen_support.py")
-        python_codegen_support = stream.read().decode("UTF-8")
-        self.out.write(python_codegen_support[python_codegen_support.find("\n") + 1 :])
-        stream.close()
-        self.out.write("\n\n")
+        self._w(_SUPPORT_TEXT)
+        self._w("\n\n")
 
-        self.out.write(
+        self._w(
             f"""def parser_info() -> str:
     return "{self.parser_info}"
 
@@ -155,195 +532,108 @@ class PythonCodeGen(CodeGenBase):
         else:
             ext = "Savable"
 
-        self.out.write(fmt(f"class {classname}({ext}):\n    pass", 0)[:-9])
+        self._w(fmt(f"class {classname}({ext}):\n    pass", 0)[:-9])
         # make a valid class for Black, but then trim off the "pass"
 
         if doc:
-            self.out.write(fmt(f'"""\n{doc}\n"""\n', 4) + "\n")
+            self._w(fmt(f'"""\n{doc}\n"""\n', 4) + "\n")
 
-        self.serializer = StringIO()
+        self._serializer_parts.clear()
 
         self.current_class_is_abstract = abstract
         if self.current_class_is_abstract:
-            self.out.write("    pass\n\n\n")
+            self._w("    pass\n\n\n")
             return
 
-        required_field_names = [f for f in field_names if f not in optional_fields]
-        optional_field_names = [f for f in field_names if f in optional_fields]
-
-        safe_inits: List[str] = ["        self,"]
-        safe_inits.extend(
-            [
-                f"        {self.safe_name(f)}: Any,"
-                for f in required_field_names
-                if f != "class"
-            ]
-        )
-        safe_inits.extend(
-            [
-                f"        {self.safe_name(f)}: Optional[Any] = None,"
-                for f in optional_field_names
-                if f != "class"
-            ]
+        self._w("    def __init__(\n        self,")
+        self._w(
+            "".join(
+                f"\n        {self.safe_name(f)}: Any,"
+                for f in field_names
+                if f not in optional_fields and f != "class"
+            )
         )
-        self.out.write(
-            "    def __init__(\n"
-            + "\n".join(safe_inits)
-            + "\n        extension_fields: Optional[Dict[str, Any]] = None,"
-            + "\n        loadingOptions: Optional[LoadingOptions] = None,"
-            + "\n    ) -> None:\n"
-            + """
-        if extension_fields:
-            self.extension_fields = extension_fields
-        else:
-            self.extension_fields = CommentedMap()
-        if loadingOptions:
-            self.loadingOptions = loadingOptions
-        else:
-            self.loadingOptions = LoadingOptions()
-"""
+        self._w(
+            "".join(
+                f"\n        {self.safe_name(f)}: Optional[Any] = None,"
+                for f in field_names
+                if f in optional_fields and f != "class"
+            )
         )
-        field_inits = ""
-        for name in field_names:
-            if name == "class":
-                field_inits += """        self.class_ = "{}"
-""".format(
-                    classname
-                )
-            else:
-                field_inits += """        self.{0} = {0}
-""".format(
-                    self.safe_name(name)
-                )
-        self.out.write(
-            field_inits
-            + f"""
-    @classmethod
-    def fromDoc(
-        cls,
-        doc: Any,
-        baseuri: str,
-        loadingOptions: LoadingOptions,
-        docRoot: Optional[str] = None,
-    ) -> "{classname}":
-        _doc = copy.copy(doc)
-        if hasattr(doc, "lc"):
-            _doc.lc.data = doc.lc.data
-            _doc.lc.filename = doc.lc.filename
-        _errors__ = []
-"""
+        self._w(_INIT_TRAILER)
+        self._w(_INIT_BODY)
+        self._w(
+            "".join(
+                f'        self.class_ = "{classname}"\n'
+                if name == "class"
+                else f"        self.{self.safe_name(name)} = {self.safe_name(name)}\n"
+                for name in field_names
+            )
         )
+        self._w(_FROM_DOC_HEAD)
+        self._w(f'"{classname}":')
+        self._w(_FROM_DOC_BODY)
 
         self.idfield = idfield
 
-        self.serializer.write(
-            """
-    def save(
-        self, top: bool = False, base_url: str = "", relative_uris: bool = True
-    ) -> Dict[str, Any]:
-        r: Dict[str, Any] = {}
-        for ef in self.extension_fields:
-            r[prefix_url(ef, self.loadingOptions.vocab)] = self.extension_fields[ef]
-"""
-        )
+        self._ws(_SAVE_PRELUDE)
 
         if "class" in field_names:
-            self.out.write(
-                """
-        if _doc.get("class") != "{class_}":
-            raise ValidationException("Not a {class_}")
-
-""".format(
-                    class_=classname
-                )
-            )
+            self._w(_tmpl_class_check(classname))
 
-            self.serializer.write(
-                """
-        r["class"] = "{class_}"
-""".format(
-                    class_=classname
-                )
-            )
+            self._ws(_tmpl_class_save(classname))
 
     def end_class(self, classname: str, field_names: List[str]) -> None:
         """Signal that we are done with this class."""
         if self.current_class_is_abstract:
             return
 
-        self.out.write(
-            fmt(
-                """
-extension_fields: Dict[str, Any] = {{}}
-for k in _doc.keys():
-    if k not in cls.attrs:
-        if ":" in k:
-            ex = expand_url(
-                k, "", loadingOptions, scoped_id=False, vocab_term=False
-            )
-            extension_fields[ex] = _doc[k]
-        else:
-            _errors__.append(
-                ValidationException(
-                    "invalid field `{{}}`, expected one of: {attrstr}".format(
-                        k
-                    ),
-                    SourceLine(_doc, k, str),
-                )
-            )
-            break
+        attrstr = ", ".join(f"`{f}`" for f in field_names)
+        self._w(_tmpl_extension_fields(attrstr, self.safe_name(classname)))
 
-if _errors__:
-    raise ValidationException(\"Trying '{class_}'\", None, _errors__)
-""".format(
-                    attrstr=", ".join([f"`{f}`" for f in field_names]),
-                    class_=self.safe_name(classname),
-                ),
-                8,
-            )
-        )
+        self._ws(_SAVE_EPILOGUE)
 
-        self.serializer.write(
-            """
-        # top refers to the directory level
-        if top:
-            if self.loadingOptions.namespaces:
-                r["$namespaces"] = self.loadingOptions.namespaces
-            if self.loadingOptions.schemas:
-                r["$schemas"] = self.loadingOptions.schemas
-"""
-        )
-
-        self.serializer.write("        return r\n\n")
-
-        self.serializer.write(
-            fmt(f"""attrs = frozenset(["{'", "'.join(field_names)}"])\n""", 4)
-        )
-
-        safe_init_fields = [
-            self.safe_name(f) for f in field_names if f != "class"
-        ]  # type: List[str]
+        self._ws(fmt(f"""attrs = frozenset(["{'", "'.join(field_names)}"])\n""", 4))
 
-        safe_inits = [f + "=" + f for f in safe_init_fields]
-
-        safe_inits.extend(
-            ["extension_fields=extension_fields", "loadingOptions=loadingOptions"]
-        )
-
-        self.out.write(
-            "        return cls(\n            "
-            + ",\n            ".join(safe_inits)
-            + ",\n        )\n"
+        self._w("        return cls(")
+        self._w(
+            "".join(
+                f"\n            {self.safe_name(f)}={self.safe_name(f)},"
+                for f in field_names
+                if f != "class"
+            )
         )
+        self._w(_RETURN_CLS_TRAILER)
 
-        self.out.write(str(self.serializer.getvalue()))
+        self._w("".join(self._serializer_parts))
 
-        self.out.write("\n\n")
+        self._w("\n\n")
 
     def type_loader(
         self, type_declaration: Union[List[Any], Dict[str, Any], str]
     ) -> TypeDef:
         """Parse the given type declaration and declare its components."""
+        if isinstance(type_declaration, str):
+            type_declaration = sys.intern(str(type_declaration))
+        elif (
+            isinstance(type_declaration, MutableMapping)
+            and type_declaration["type"] not in _ARRAY_TYPES
+        ):
+            # Records and enums are declared once by name, so freezing them for
+            # the cache would only cost a walk of the whole declaration.
+            return self._type_loader(type_declaration)
+        try:
+            key = _freeze(type_declaration)
+            cached = self._loader_cache.get(key)
+        except TypeError:  # unhashable leaf values
+            return self._type_loader(type_declaration)
+        if cached is None:
+            cached = self._loader_cache[key] = self._type_loader(type_declaration)
+        return cached
+
+    def _type_loader(
+        self, type_declaration: Union[List[Any], Dict[str, Any], str]
+    ) -> TypeDef:
         if isinstance(type_declaration, MutableSequence):
 
             sub_names: List[str] = list(
@@ -356,15 +646,13 @@ if _errors__:
                 )
             )
         if isinstance(type_declaration, MutableMapping):
-            if type_declaration["type"] in (
-                "array",
-                "https://w3id.org/cwl/salad#array",
-            ):
+            decl_type = type_declaration["type"]
+            if decl_type in _ARRAY_TYPES:
                 i = self.type_loader(type_declaration["items"])
                 return self.declare_type(
                     TypeDef(f"array_of_{i.name}", f"_ArrayLoader({i.name})")
                 )
-            if type_declaration["type"] in ("enum", "https://w3id.org/cwl/salad#enum"):
+            if decl_type in _ENUM_TYPES:
                 for sym in type_declaration["symbols"]:
                     self.add_vocab(shortname(sym), sym)
                 return self.declare_type(
@@ -379,25 +667,21 @@ if _errors__:
                     )
                 )
 
-            if type_declaration["type"] in (
-                "record",
-                "https://w3id.org/cwl/salad#record",
-            ):
+            if decl_type in _RECORD_TYPES:
+                record_name = self.safe_name(type_declaration["name"])
                 return self.declare_type(
                     TypeDef(
-                        self.safe_name(type_declaration["name"]) + "Loader",
-                        "_RecordLoader({})".format(
-                            self.safe_name(type_declaration["name"]),
-                        ),
+                        record_name + "Loader",
+                        f"_RecordLoader({record_name})",
                         abstract=type_declaration.get("abstract", False),
                     )
                 )
-            raise SchemaException("wft {}".format(type_declaration["type"]))
+            raise SchemaException(f"wft {decl_type}")
 
         if type_declaration in prims:
             return prims[type_declaration]
 
-        if type_declaration in ("Expression", "https://w3id.org/cwl/cwl#Expression"):
+        if type_declaration in _EXPRESSION_TYPES:
             return self.declare_type(
                 TypeDef(
                     self.safe_name(type_declaration) + "Loader",
@@ -431,18 +715,9 @@ if _errors__:
         if subscope is not None:
             name = name + subscope
 
-        self.out.write(
-            """
-        __original_{safename}_is_none = {safename} is None
-        if {safename} is None:
-            if docRoot is not None:
-                {safename} = docRoot
-            else:
-                {opt}
-        if not __original_{safename}_is_none:
-            baseuri = {safename}
-""".format(
-                safename=self.safe_name(name), opt=opt
+        self._w(
+            _ID_FIELD_TMPL.replace("__SAFE__", self.safe_name(name)).replace(
+                "__OPT__", opt
             )
         )
 
@@ -457,81 +732,25 @@ if _errors__:
             return
 
         if optional:
-            self.out.write(f"""        if "{shortname(name)}" in _doc:\n""")
-            spc = "    "
-        else:
-            spc = ""
-        self.out.write(
-            """{spc}        try:
-{spc}            {safename} = load_field(
-{spc}                _doc.get("{fieldname}"),
-{spc}                {fieldtype},
-{spc}                baseuri,
-{spc}                loadingOptions,
-{spc}            )
-{spc}        except ValidationException as e:
-{spc}            _errors__.append(
-{spc}                ValidationException(
-{spc}                    \"the `{fieldname}` field is not valid because:\",
-{spc}                    SourceLine(_doc, "{fieldname}", str),
-{spc}                    [e],
-{spc}                )
-{spc}            )
-""".format(
-                safename=self.safe_name(name),
-                fieldname=shortname(name),
-                fieldtype=fieldtype.name,
-                spc=spc,
-            )
+            self._w(f"""        if "{shortname(name)}" in _doc:\n""")
+        self._w(
+            _FIELD_TMPLS[optional]
+            .replace("__SAFE__", self.safe_name(name))
+            .replace("__FIELD__", shortname(name))
+            .replace("__TYPE__", fieldtype.name)
         )
         if optional:
-            self.out.write(
-                """        else:
-            {safename} = None
-""".format(
-                    safename=self.safe_name(name)
-                )
-            )
+            self._w(f"        else:\n            {self.safe_name(name)} = None\n")
 
         if name == self.idfield or not self.idfield:
             baseurl = "base_url"
         else:
             baseurl = f"self.{self.safe_name(self.idfield)}"
 
-        if fieldtype.is_uri:
-            self.serializer.write(
-                fmt(
-                    """
-if self.{safename} is not None:
-    u = save_relative_uri(self.{safename}, {baseurl}, {scoped_id}, {ref_scope}, relative_uris)
-    if u:
-        r["{fieldname}"] = u
-""".format(
-                        safename=self.safe_name(name),
-                        fieldname=shortname(name).strip(),
-                        baseurl=baseurl,
-                        scoped_id=fieldtype.scoped_id,
-                        ref_scope=fieldtype.ref_scope,
-                    ),
-                    8,
-                )
-            )
-        else:
-            self.serializer.write(
-                fmt(
-                    """
-if self.{safename} is not None:
-    r["{fieldname}"] = save(
-        self.{safename}, top=False, base_url={baseurl}, relative_uris=relative_uris
-    )
-""".format(
-                        safename=self.safe_name(name),
-                        fieldname=shortname(name),
-                        baseurl=baseurl,
-                    ),
-                    8,
-                )
-            )
+        fieldname = shortname(name).strip() if fieldtype.is_uri else shortname(name)
+        self._ws(
+            _save_field_snippet(self.safe_name(name), fieldname, baseurl, fieldtype)
+        )
 
     def uri_loader(
         self,
@@ -586,24 +805,40 @@ if self.{safename} is not None:
 
     def epilogue(self, root_loader: TypeDef) -> None:
         """Trigger to generate the epilouge code."""
-        self.out.write("_vocab = {\n")
-        for k in sorted(self.vocab.keys()):
-            self.out.write(f'    "{k}": "{self.vocab[k]}",\n')
-        self.out.write("}\n")
-
-        self.out.write("_rvocab = {\n")
-        for k in sorted(self.vocab.keys()):
-            self.out.write(f'    "{self.vocab[k]}": "{k}",\n')
-        self.out.write("}\n\n")
-
-        for _, collected_type in self.collected_types.items():
-            if not collected_type.abstract:
-                self.out.write(
-                    fmt(f"{collected_type.name} = {collected_type.init}\n", 0)
-                )
-        self.out.write("\n")
+        items = sorted(self.vocab.items())
+        self._w(
+            "_vocab = {\n" + "".join(f'    "{k}": "{v}",\n' for k, v in items) + "}\n"
+        )
+        self._w(
+            "_rvocab = {\n"
+            + "".join(f'    "{v}": "{k}",\n' for k, v in items)
+            + "}\n\n"
+        )
 
-        self.out.write(
+        type_defs = [
+            f"{collected_type.name} = {collected_type.init}\n"
+            for collected_type in self.collected_types.values()
+            if not collected_type.abstract
+        ]
+        # Trivial type definitions skip black entirely; the others are formatted
+        # in batches to amortize black's per call cost, keeping their order.
+        batch: List[str] = []
+        for type_def in type_defs:
+            if _is_trivial(type_def, 0):
+                if batch:
+                    self._w(_format_cached("".join(batch), 0))
+                    batch = []
+                self._w(type_def)
+            else:
+                batch.append(type_def)
+                if len(batch) == _TYPE_DEFS_BATCH_SIZE:
+                    self._w(_format_cached("".join(batch), 0))
+                    batch = []
+        if batch:
+            self._w(_format_cached("".join(batch), 0))
+        self._w("\n")
+
+        self._w(
             """
 def load_document(
     doc: Any,
@@ -671,3 +906,4 @@ def load_document_by_yaml(
 """
             % dict(name=root_loader.name)
         )
+        self._flush()
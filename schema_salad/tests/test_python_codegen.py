@@ -1,11 +1,28 @@
 import inspect
 import os
+import textwrap
+from io import StringIO
 from pathlib import Path
 from typing import Any, Dict, List, Optional, cast
 
+import pytest
+
 import schema_salad.metaschema as cg_metaschema
+import schema_salad.python_codegen as cg_python
 from schema_salad import codegen
 from schema_salad.avro.schema import Names
+from schema_salad.codegen_base import TypeDef
+from schema_salad.python_codegen import (
+    PythonCodeGen,
+    _format_cached,
+    _indent_fast,
+    _is_trivial,
+    _save_field_snippet,
+    _tmpl_extension_fields,
+    _tmpl_save,
+    _tmpl_save_uri,
+    fmt,
+)
 from schema_salad.schema import load_schema
 
 from .util import basket_file_uri, cwl_file_uri, metaschema_file_uri
@@ -90,3 +107,165 @@ def test_use_of_package_for_parser_info(tmp_path: Path) -> None:
     assert os.path.exists(src_target)
     with open(src_target) as f:
         assert 'def parser_info() -> str:\n    return "cwl"' in f.read()
+
+
+@pytest.mark.parametrize(
+    "snippet",
+    [
+        "strtype = _PrimitiveLoader(str)\n",
+        "None_type = _PrimitiveLoader(type(None))\n",
+        "uri_strtype_True_False_None = _URILoader(strtype, True, False, None)\n",
+        'attrs = frozenset(["name", "type"])\n',
+    ],
+)
+@pytest.mark.parametrize("indent", [0, 4, 8])
+def test_fmt_fast_path(snippet: str, indent: int) -> None:
+    """The fast path of fmt() must match what black would produce."""
+    assert _is_trivial(snippet, indent)
+    assert fmt(snippet, indent) == _format_cached(snippet, indent)
+
+
+def test_indent_fast_verbatim() -> None:
+    """Only newlines end a line, other line boundaries are passed through."""
+    code = 'def f():\n    """a\x0cb\x85c\u2028d"""\n\n    return 1\n'
+    assert _indent_fast(code, 4) == (
+        '    def f():\n        """a\x0cb\x85c\u2028d"""\n\n        return 1\n'
+    )
+
+
+@pytest.mark.parametrize(
+    "snippet",
+    [
+        "union_of_a_or_b = _UnionLoader((a, b,))\n",
+        "idmap_x = _IdMapLoader(x, 'name', 'None')\n",
+        "x = f(a,b)\n",
+        "x = f( a)\n",
+        "x = f(a , b)\n",
+        "x = f(a, )\n",
+        "x = not(a)\n",
+    ],
+)
+def test_fmt_fast_path_rejects(snippet: str) -> None:
+    """Snippets that black would rewrite must not take the fast path."""
+    assert not _is_trivial(snippet, 0)
+    assert fmt(snippet, 0) == _format_cached(snippet, 0)
+
+
+@pytest.mark.parametrize(
+    "attrstr", ["`a`", "`doc`, `name`", ", ".join(["`field`"] * 20)]
+)
+@pytest.mark.parametrize("classname", ["C", "A" * 40, "B" * 90])
+def test_extension_fields_black_stable(attrstr: str, classname: str) -> None:
+    """The extension field check is emitted as black would format it."""
+    code = _tmpl_extension_fields(attrstr, classname)
+    assert _format_cached(textwrap.dedent(code), 8) == code
+
+
+def test_declare_field_template() -> None:
+    """Check the field loading code emitted for an optional field."""
+    gen = PythonCodeGen(StringIO(), None, "test")
+    gen.declare_field(
+        "https://example.com/schema#Thing/in",
+        TypeDef("union_of_None_type_or_strtype", "_UnionLoader((None_type, strtype,))"),
+        None,
+        True,
+    )
+    assert textwrap.dedent("".join(gen._out_parts)) == textwrap.dedent(
+        """\
+                if "in" in _doc:
+                    try:
+                        in_ = load_field(
+                            _doc.get("in"),
+                            union_of_None_type_or_strtype,
+                            baseuri,
+                            loadingOptions,
+                        )
+                    except ValidationException as e:
+                        _errors__.append(
+                            ValidationException(
+                                "the `in` field is not valid because:",
+                                SourceLine(_doc, "in", str),
+                                [e],
+                            )
+                        )
+                else:
+                    in_ = None
+        """
+    )
+
+
+@pytest.mark.parametrize("is_uri", [False, True])
+@pytest.mark.parametrize("length", [1, 8, 30, 60])
+def test_save_field_snippet(is_uri: bool, length: int) -> None:
+    """Cached serializer snippets match formatting each one with black."""
+    fieldtype = TypeDef("strtype", "", is_uri=is_uri, scoped_id=True, ref_scope=2)
+    for safename, fieldname in (("a" * length, "b" * length), ("in_", "in")):
+        if is_uri:
+            expected = fmt(_tmpl_save_uri(safename, fieldname, "self.id", True, 2), 8)
+        else:
+            expected = fmt(_tmpl_save(safename, fieldname, "self.id"), 8)
+        assert (
+            _save_field_snippet(safename, fieldname, "self.id", fieldtype) == expected
+        )
+
+
+def test_type_loader_cache() -> None:
+    """Only unions, arrays and type names go through the loader cache."""
+    gen = PythonCodeGen(StringIO(), None, "test")
+    enum = {"type": "enum", "name": "https://example.com/#E", "symbols": ["a"]}
+    union = ["null", {"type": "array", "items": "string"}]
+    assert gen.type_loader(union) is gen.type_loader(list(union))
+    assert gen.type_loader(enum).name == "ELoader"
+    assert set(gen._loader_cache) == {
+        "null",
+        "string",
+        frozenset({("type", "array"), ("items", "string")}),
+        ("null", frozenset({("type", "array"), ("items", "string")})),
+    }
+
+
+def test_epilogue_type_defs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Type definitions keep their order whether or not they skip black."""
+    monkeypatch.setattr("schema_salad.python_codegen._TYPE_DEFS_BATCH_SIZE", 2)
+    out = StringIO()
+    gen = PythonCodeGen(out, None, "test")
+    type_defs = [
+        TypeDef("a", "_PrimitiveLoader(str)"),
+        TypeDef("b", "_UnionLoader((a, None_type,))"),
+        TypeDef("c", "_IdMapLoader(b, 'name', 'None')"),
+        TypeDef("d", "_UnionLoader((c,))"),
+        TypeDef("e", "_ArrayLoader(a)"),
+        TypeDef("f", "_ArrayLoader(e)", abstract=True),
+        TypeDef("g", "_UnionLoader((a, e,))"),
+    ]
+    for type_def in type_defs:
+        gen.declare_type(type_def)
+    gen.epilogue(type_defs[0])
+    expected = _format_cached(
+        "".join(f"{t.name} = {t.init}\n" for t in type_defs if not t.abstract), 0
+    )
+    assert expected in out.getvalue()
+
+
+@pytest.mark.skipif(
+    not cg_python.__file__.endswith(".py"),
+    reason="mypyc compiled modules do not see patched globals",
+)
+def test_epilogue_without_black(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Type definitions that need black report it missing."""
+    monkeypatch.setattr("schema_salad.python_codegen.black", None)
+    gen = PythonCodeGen(StringIO(), None, "test")
+    enum = {"type": "enum", "name": "https://example.com/#NoBlack", "symbols": ["a"]}
+    with pytest.raises(Exception, match="pycodegen"):
+        gen.epilogue(gen.type_loader(enum))
+
+
+def test_output_newline_translation(tmp_path: Path) -> None:
+    """The generated code goes through the text stream and its newline handling."""
+    target = tmp_path / "crlf.py"
+    with open(target, "w", encoding="utf-8", newline="\r\n") as out:
+        out.write("# header\n")
+        gen = PythonCodeGen(out, None, "test")
+        gen._w("a = 1\nb = 2\n")
+        gen._flush()
+    assert target.read_bytes() == b"# header\r\na = 1\r\nb = 2\r\n"
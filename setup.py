@@ -39,7 +39,7 @@ if USE_MYPYC:
         "schema_salad/__main__.py",
         "schema_salad/main.py",
         "schema_salad/makedoc.py",
-        # "schema_salad/python_codegen.py",  # due to use of __name__
+        "schema_salad/python_codegen.py",
         "schema_salad/ref_resolver.py",
         # "schema_salad/fetcher.py",  # to allow subclassing {Default,}Fetcher
         "schema_salad/schema.py",